@@ -1,25 +1,81 @@
+import os
+
+# Tesseract spawns 4 OpenMP threads per image by default, which oversubscribes
+# the CPU when strips are OCR'd in parallel processes
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
 import streamlit as st
 import pytesseract
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
 from PIL import Image
-from openai import OpenAI
+import numpy as np
+import cv2
+from openai import OpenAI, AsyncOpenAI, RateLimitError
 import re
-import os
+import json
+import base64
+import hashlib
+import shutil
 from io import BytesIO
-import requests
+import asyncio
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 import pandas as pd
 
 
-# Ensure Tesseract OCR is configured correctly
-possible_paths = [
+# Ensure Tesseract OCR is configured correctly; no spinner, since this runs before set_page_config
+@st.cache_resource(show_spinner=False)
+def find_tesseract():
+    """Locate the tesseract binary once, preferring PATH over common Windows installs"""
+    tess = shutil.which("tesseract")
+    if tess:
+        return tess
+    
+    possible_paths = [
         r"C:\Program Files\Tesseract-OCR\tesseract.exe",
         r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
         r"C:\Users\AppData\Local\Programs\Tesseract-OCR\tesseract.exe"
     ]
-for path in possible_paths:
+    for path in possible_paths:
         if os.path.exists(path):
-            pytesseract.pytesseract.tesseract_cmd = path
-            break
+            return path
+    return None
+
+tesseract_path = find_tesseract()
+if tesseract_path:
+    pytesseract.pytesseract.tesseract_cmd = tesseract_path
+else:
+    # Don't cache a failed lookup, so a later install is picked up on the next rerun
+    find_tesseract.clear()
+
+
+# Upper bound on parallel tesseract processes; CPU affinity reports the host's
+# cores inside containers, so it can't be trusted to reflect the CPU quota
+MAX_OCR_WORKERS = int(os.environ.get("MAX_OCR_WORKERS", "2"))
+
+def ocr_worker_count():
+    """Number of tesseract processes to run at once"""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    return max(1, min(cpus, MAX_OCR_WORKERS))
+
+@st.cache_resource
+def get_ocr_pool():
+    """Shared pool for OCR'ing strips; each pytesseract call runs its own tesseract process"""
+    return ThreadPoolExecutor(max_workers=ocr_worker_count())
+
+@st.cache_resource
+def get_ocr_api():
+    """Load Tesseract in-process once; the lock serializes access across sessions"""
+    api = tesserocr.PyTessBaseAPI(lang="eng", psm=tesserocr.PSM.SINGLE_BLOCK, oem=tesserocr.OEM.LSTM_ONLY)
+    return api, threading.Lock()
 
 
 # Configure the page
@@ -35,11 +91,90 @@ st.markdown("Upload a menu image and I'll generate pictures of the dishes!")
 # Sidebar for API configuration
 st.sidebar.header("⚙️ Configuration")
 openai_api_key = st.sidebar.text_input("OpenAI API Key", type="password", help="Enter your OpenAI API key")
+openai_rpm = st.sidebar.number_input(
+    "OpenAI RPM limit",
+    min_value=1,
+    value=50,
+    help="Image requests per minute allowed by your OpenAI tier, shared by every session using the same key"
+)
+
+# Tesseract page segmentation modes; skipping layout analysis is much faster
+PSM_MODES = {
+    "6 (single block)": 6,
+    "4 (columns)": 4,
+    "3 (auto)": 3,
+}
+psm_mode = st.sidebar.selectbox(
+    "Layout",
+    list(PSM_MODES),
+    help="Use single block for cropped single-column menus, auto for complex layouts"
+)
+
+# Largest size of the uploaded menu preview sent to the browser
+THUMBNAIL_SIZE = (800, 800)
+
+# Menu photos wider than this are downscaled before OCR
+MAX_OCR_WIDTH = 2000
+
+# Price patterns used when parsing menu text
+PRICE_PREFIX = re.compile(r'^[\d\$\£\€\¥]+')
+PRICE_TAG = re.compile(r'\$\d+')
+PRICE_SUB = re.compile(r'\$[\d.]+')
 
-# Initialize OpenAI client
+# Prompt and response schema for extracting dishes with a single GPT call
+PARSE_PROMPT = (
+    "The following text was extracted from a restaurant menu with OCR. "
+    "List every dish on the menu with its name and description. "
+    "Ignore prices, section headers and restaurant details; use an empty "
+    "description if the menu has none.\n\n"
+)
+MENU_SCHEMA = {
+    "name": "menu_items",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "items": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "description": {"type": "string"},
+                    },
+                    "required": ["name", "description"],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["items"],
+        "additionalProperties": False,
+    },
+}
+
+# Images taller than this are split into strips and OCR'd in parallel
+PARALLEL_OCR_MIN_HEIGHT = 2000
+# Strips shorter than this would hold only a line or two of text
+MIN_STRIP_HEIGHT = 300
+# Rows with at most this fraction of dark pixels count as blank when cutting strips
+BLANK_ROW_MAX_INK = 0.005
+
+# Maximum number of DALL-E requests in flight during bulk generation
+MAX_CONCURRENT_REQUESTS = 8
+# Generated images are persisted here, one PNG per dish and API key
+IMAGE_CACHE_DIR = ".image_cache"
+# Cached images older than this (seconds) are regenerated and pruned from disk
+IMAGE_CACHE_TTL = 86400
+
+# Initialize OpenAI clients; tenacity handles retries, so the SDK's own are disabled
 client = None
+async_client = None
+api_key_hash = None
 if openai_api_key:
-    client = OpenAI(api_key=openai_api_key)
+    client = OpenAI(api_key=openai_api_key, max_retries=0)
+    async_client = AsyncOpenAI(api_key=openai_api_key, max_retries=0)
+    # Hash the key so cached images are kept per key without storing it
+    api_key_hash = hashlib.sha256(openai_api_key.encode()).hexdigest()
 
 # File upload
 uploaded_file = st.file_uploader(
@@ -48,23 +183,81 @@ uploaded_file = st.file_uploader(
     help="Upload a clear image of a menu"
 )
 
-def extract_text_from_image(image):
+# Read the upload once; the stored bytes are the stable cache key for every rerun
+if uploaded_file is not None and st.session_state.get("uploaded_file_id") != uploaded_file.file_id:
+    st.session_state["menu_bytes"] = uploaded_file.getvalue()
+    st.session_state["uploaded_file_id"] = uploaded_file.file_id
+
+def tesseract_config(psm):
+    """Build the Tesseract options for a page segmentation mode, LSTM engine only"""
+    return f"--psm {psm} --oem 1 -l eng"
+
+def ocr_tile(tile, psm=6):
+    """OCR a single strip of a menu image on a pool thread"""
+    return pytesseract.image_to_string(tile, config=tesseract_config(psm))
+
+def preprocess_for_ocr(image):
+    """Convert a menu photo to a downscaled, binarized image that Tesseract reads quickly"""
+    gray = image.convert("L")
+    if gray.width > MAX_OCR_WIDTH:
+        height = round(gray.height * MAX_OCR_WIDTH / gray.width)
+        gray = gray.resize((MAX_OCR_WIDTH, height), Image.LANCZOS)
+    
+    bw = cv2.adaptiveThreshold(
+        np.asarray(gray), 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10
+    )
+    return Image.fromarray(bw)
+
+def split_into_strips(image, count):
+    """Split a binarized image into up to count horizontal strips, cutting only at blank rows"""
+    ink = (np.asarray(image) < 128).sum(axis=1)
+    blank_rows = np.flatnonzero(ink <= image.width * BLANK_ROW_MAX_INK)
+    
+    cuts = [0]
+    for k in range(1, count):
+        target = k * image.height // count
+        candidates = blank_rows[
+            (blank_rows >= cuts[-1] + MIN_STRIP_HEIGHT) & (blank_rows <= image.height - MIN_STRIP_HEIGHT)
+        ]
+        if candidates.size == 0:
+            break
+        cuts.append(int(candidates[np.abs(candidates - target).argmin()]))
+    cuts.append(image.height)
+    
+    return [image.crop((0, top, image.width, bottom)) for top, bottom in zip(cuts, cuts[1:])]
+
+def extract_text_from_image(image, psm=6):
     """Extract text from image using Tesseract OCR"""
-    try:
-        text = pytesseract.image_to_string(image)
-        return text
-    except Exception as e:
-        st.error(f"Error extracting text: {str(e)}")
-        st.error("Tesseract OCR not found. Please install Tesseract or use Google Cloud Vision API instead.")
-        st.markdown("""
-        **To fix this:**
-        1. **Windows**: Download from https://github.com/UB-Mannheim/tesseract/wiki
-        2. **Mac**: Run `brew install tesseract`
-        3. **Linux**: Run `sudo apt-get install tesseract-ocr`
-        
-        Or contact me to switch to Google Cloud Vision API.
-        """)
-        return ""
+    image = preprocess_for_ocr(image)
+    
+    strip_count = min(ocr_worker_count(), image.height // MIN_STRIP_HEIGHT)
+    if image.height > PARALLEL_OCR_MIN_HEIGHT and strip_count > 1:
+        strips = split_into_strips(image, strip_count)
+        chunks = get_ocr_pool().map(ocr_tile, strips, [psm] * len(strips))
+        return "\n".join(chunks)
+    
+    if tesserocr is None:
+        return pytesseract.image_to_string(image, config=tesseract_config(psm))
+    
+    api, lock = get_ocr_api()
+    with lock:
+        api.SetPageSegMode(psm)
+        api.SetImage(image)
+        text = api.GetUTF8Text()
+    return text
+
+def show_ocr_error(e):
+    """Explain an OCR failure and how to install Tesseract"""
+    st.error(f"Error extracting text: {str(e)}")
+    st.error("Tesseract OCR not found. Please install Tesseract or use Google Cloud Vision API instead.")
+    st.markdown("""
+    **To fix this:**
+    1. **Windows**: Download from https://github.com/UB-Mannheim/tesseract/wiki
+    2. **Mac**: Run `brew install tesseract`
+    3. **Linux**: Run `sudo apt-get install tesseract-ocr`
+    
+    Or contact me to switch to Google Cloud Vision API.
+    """)
 
 def parse_menu_items(text):
     """Parse menu text to extract dish names and descriptions"""
@@ -72,7 +265,7 @@ def parse_menu_items(text):
     menu_items = []
     
     current_item = ""
-    current_description = ""
+    current_description = []
     
     for line in lines:
         line = line.strip()
@@ -80,31 +273,176 @@ def parse_menu_items(text):
             continue
             
         # Skip obvious non-food items (prices, headers, etc.)
-        if re.match(r'^[\d\$\£\€\¥]+', line) or len(line) < 3:
+        if PRICE_PREFIX.match(line) or len(line) < 3:
             continue
             
         # Check if line looks like a dish name (often shorter, may have price at end)
-        if len(line) < 50 and (re.search(r'\$\d+', line) or line.isupper() or line.istitle()):
+        if len(line) < 50 and (PRICE_TAG.search(line) or line.isupper() or line.istitle()):
             if current_item:
                 menu_items.append({
                     'name': current_item,
-                    'description': current_description
+                    'description': " ".join(current_description)
                 })
-            current_item = re.sub(r'\$[\d.]+', '', line).strip()
-            current_description = ""
+            current_item = PRICE_SUB.sub('', line).strip()
+            current_description = []
         else:
             # This looks like a description
-            current_description += " " + line
+            current_description.append(line)
     
     # Add the last item
     if current_item:
         menu_items.append({
             'name': current_item,
-            'description': current_description.strip()
+            'description': " ".join(current_description)
         })
     
     return menu_items
 
+@st.cache_data(ttl=86400, show_spinner=False)
+def parse_menu_items_llm(text):
+    """Extract dish names and descriptions from menu text in one GPT call"""
+    response = client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[{"role": "user", "content": PARSE_PROMPT + text}],
+        response_format={"type": "json_schema", "json_schema": MENU_SCHEMA},
+    )
+    return json.loads(response.choices[0].message.content)["items"]
+
+@st.cache_data(show_spinner=False)
+def ocr_and_parse(image_bytes, psm=6):
+    """Extract and parse menu items from uploaded image bytes, cached across reruns; raises if OCR fails"""
+    image = Image.open(BytesIO(image_bytes))
+    if image.format == "JPEG":
+        # Let libjpeg decode straight to grayscale, reduced only as far as the OCR width cap allows
+        image.draft("L", (MAX_OCR_WIDTH, 1))
+    text = extract_text_from_image(image, psm)
+    return parse_menu_items(text), text
+
+@st.cache_data(show_spinner=False)
+def make_thumbnail(image_bytes):
+    """Downscale the uploaded menu for display so the full original isn't sent on every rerun"""
+    thumb = Image.open(BytesIO(image_bytes))
+    thumb.thumbnail(THUMBNAIL_SIZE, Image.LANCZOS)
+    return thumb
+
+def build_image_prompt(dish_name, description=""):
+    """Build the DALL-E prompt for a food dish"""
+    prompt = f"A high-quality, appetizing photo of {dish_name}"
+    if description:
+        prompt += f", {description[:100]}"  # Limit description length
+    prompt += ", professional food photography, well-lit, restaurant quality"
+    return prompt
+
+def is_retryable_rate_limit(e):
+    """Rate limits clear up after a wait; an exhausted quota never does"""
+    return isinstance(e, RateLimitError) and e.code != "insufficient_quota"
+
+# Back off exponentially when OpenAI rate limits a request
+retry_on_rate_limit = retry(
+    retry=retry_if_exception(is_retryable_rate_limit),
+    wait=wait_exponential(multiplier=1, min=1, max=30),
+    stop=stop_after_attempt(5),
+    reraise=True,
+)
+
+@st.cache_resource(show_spinner=False)
+def get_rate_limiter(api_key_hash, rpm):
+    """Token bucket shared by every run and session using the same API key and RPM limit"""
+    return {"tokens": float(rpm), "updated": time.monotonic()}, threading.Lock()
+
+def take_request_token(rpm):
+    """Take a token from the key's bucket, or return how many seconds until one is available"""
+    bucket, lock = get_rate_limiter(api_key_hash, rpm)
+    with lock:
+        now = time.monotonic()
+        rate = rpm / 60
+        bucket["tokens"] = min(rpm, bucket["tokens"] + (now - bucket["updated"]) * rate)
+        bucket["updated"] = now
+        if bucket["tokens"] >= 1:
+            bucket["tokens"] -= 1
+            return 0
+        return (1 - bucket["tokens"]) / rate
+
+def wait_for_request_token(rpm):
+    """Block until the RPM budget allows another request"""
+    while wait := take_request_token(rpm):
+        time.sleep(wait)
+
+async def wait_for_request_token_async(rpm):
+    """Wait, without blocking other requests, until the RPM budget allows another request"""
+    while wait := take_request_token(rpm):
+        await asyncio.sleep(wait)
+
+@retry_on_rate_limit
+def request_image(prompt):
+    """Request a DALL-E image, backing off exponentially on rate limits"""
+    # Every attempt, including retries, spends a token from the RPM budget
+    wait_for_request_token(openai_rpm)
+    return client.images.generate(
+        model="dall-e-3",
+        prompt=prompt,
+        size="1024x1024",
+        quality="standard",
+        n=1,
+        response_format="b64_json",
+    )
+
+def image_cache_path(key):
+    """Path of the cached PNG for a (prompt, api_key_hash) key"""
+    prompt, key_hash = key
+    name = hashlib.sha256(f"{key_hash}:{prompt}".encode()).hexdigest()
+    return os.path.join(IMAGE_CACHE_DIR, f"{name}.png")
+
+def is_expired(path):
+    """Whether a cached file is older than IMAGE_CACHE_TTL"""
+    return time.time() - os.path.getmtime(path) > IMAGE_CACHE_TTL
+
+def get_cached_image(key):
+    """Read a previously generated image from disk, or None if missing or expired"""
+    path = image_cache_path(key)
+    try:
+        if is_expired(path):
+            os.remove(path)
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+def prune_image_cache():
+    """Delete expired images so the cache directory doesn't grow without bound"""
+    for entry in os.scandir(IMAGE_CACHE_DIR):
+        try:
+            if is_expired(entry.path):
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+def cache_image(key, png_bytes):
+    """Write a generated image to disk; the rename means other sessions never read a partial file"""
+    os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+    prune_image_cache()
+    path = image_cache_path(key)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(png_bytes)
+    os.replace(tmp_path, path)
+
+def request_food_image(dish_name, description=""):
+    """Request a DALL-E image, reusing the cached one for this dish and API key"""
+    # Create a descriptive prompt
+    prompt = build_image_prompt(dish_name, description)
+    key = (prompt, api_key_hash)
+    
+    png_bytes = get_cached_image(key)
+    if png_bytes is None:
+        response = request_image(prompt)
+        # The image comes back inline, so there is no second download
+        png_bytes = base64.b64decode(response.data[0].b64_json)
+        cache_image(key, png_bytes)
+    
+    return png_bytes
+
 def generate_food_image(dish_name, description=""):
     """Generate an image of a food dish using OpenAI's DALL-E"""
     if not client:
@@ -112,49 +450,130 @@ def generate_food_image(dish_name, description=""):
         return None
     
     try:
-        # Create a descriptive prompt
-        prompt = f"A high-quality, appetizing photo of {dish_name}"
-        if description:
-            prompt += f", {description[:100]}"  # Limit description length
-        prompt += ", professional food photography, well-lit, restaurant quality"
-        
-        response = client.images.generate(
-            model="dall-e-3",
-            prompt=prompt,
-            size="1024x1024",
-            quality="standard",
-            n=1,
-        )
-        
-        image_url = response.data[0].url
-        
-        # Download the image
-        img_response = requests.get(image_url)
-        img = Image.open(BytesIO(img_response.content))
-        
-        return img
+        return request_food_image(dish_name, description)
         
     except Exception as e:
         st.error(f"Error generating image for {dish_name}: {str(e)}")
         return None
 
+@retry_on_rate_limit
+async def request_image_async(async_client, prompt):
+    """Request a DALL-E image, backing off exponentially on rate limits"""
+    # Every attempt, including retries, spends a token from the RPM budget
+    await wait_for_request_token_async(openai_rpm)
+    return await async_client.images.generate(
+        model="dall-e-3",
+        prompt=prompt,
+        size="1024x1024",
+        quality="standard",
+        n=1,
+        response_format="b64_json",
+    )
+
+async def generate_food_image_async(async_client, sem, item):
+    """Generate PNG bytes for a menu item without blocking other requests"""
+    prompt = build_image_prompt(item['name'], item['description'])
+    key = (prompt, api_key_hash)
+    
+    png_bytes = get_cached_image(key)
+    if png_bytes is not None:
+        return item, png_bytes
+    
+    try:
+        async with sem:
+            response = await request_image_async(async_client, prompt)
+    except Exception as e:
+        return item, e
+    
+    png_bytes = base64.b64decode(response.data[0].b64_json)
+    cache_image(key, png_bytes)
+    return item, png_bytes
+
+async def generate_all_images_async(menu_items, progress_bar):
+    """Generate images for all menu items concurrently, showing each as it finishes"""
+    sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    tasks = [generate_food_image_async(async_client, sem, item) for item in menu_items]
+    
+    failed = 0
+    for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+        item, result = await task
+        if isinstance(result, Exception):
+            failed += 1
+            st.error(f"Error generating image for {item['name']}: {str(result)}")
+        else:
+            st.image(result, caption=f"Generated: {item['name']}", width=300)
+        
+        # Update progress
+        progress_bar.progress(done / len(menu_items))
+    
+    return failed
+
+def load_menu(image_bytes, psm=6):
+    """OCR the menu and identify its dishes, using GPT when an API key is available"""
+    try:
+        menu_items, extracted_text = ocr_and_parse(image_bytes, psm)
+    except Exception as e:
+        # Shown outside the cached function so a failed OCR is retried on the next run
+        show_ocr_error(e)
+        return [], ""
+    
+    if not (extracted_text and client):
+        return menu_items, extracted_text
+    
+    # Failed GPT calls aren't cached, so remember them for this session to avoid repeating them every rerun
+    llm_failures = st.session_state.setdefault("llm_parse_failures", {})
+    failure_key = (extracted_text, api_key_hash)
+    if failure_key not in llm_failures:
+        try:
+            llm_items = parse_menu_items_llm(extracted_text)
+        except Exception as e:
+            llm_failures[failure_key] = str(e)
+        else:
+            # An empty answer shouldn't hide dishes the regex parser did find
+            if llm_items:
+                return llm_items, extracted_text
+            llm_failures[failure_key] = "no menu items found"
+    
+    st.warning(f"Falling back to basic menu parsing: {llm_failures[failure_key]}")
+    return menu_items, extracted_text
+
+@st.fragment
+def render_item(item, i):
+    """Render a menu item; its Generate button reruns only this fragment"""
+    st.markdown(f"### {item['name']}")
+    if item['description']:
+        st.write(f"*{item['description'][:200]}...*" if len(item['description']) > 200 else f"*{item['description']}*")
+    
+    # Generate image button
+    if st.button(f"Generate Image for {item['name']}", key=f"gen_{i}"):
+        if client:
+            with st.spinner(f"Generating image for {item['name']}..."):
+                generated_image = generate_food_image(item['name'], item['description'])
+                if generated_image:
+                    st.image(generated_image, caption=f"Generated: {item['name']}", width=300)
+        else:
+            st.warning("Please enter your OpenAI API key to generate images")
+    
+    st.divider()
+
 # Main app logic
 if uploaded_file is not None:
-    # Display uploaded image
-    image = Image.open(uploaded_file)
+    # Display a thumbnail of the uploaded image; OCR works from the original bytes
+    menu_bytes = st.session_state["menu_bytes"]
+    thumb = make_thumbnail(menu_bytes)
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("📄 Uploaded Menu")
-        st.image(image, caption="Uploaded Menu", use_column_width=True)
+        st.image(thumb, caption="Uploaded Menu", use_column_width=True)
     
     with col2:
         st.subheader("🔍 Processing...")
         
-        # Extract text
+        # Extract text and identify menu items
         with st.spinner("Extracting text from image..."):
-            extracted_text = extract_text_from_image(image)
+            menu_items, extracted_text = load_menu(menu_bytes, PSM_MODES[psm_mode])
         
         if extracted_text:
             st.success("Text extracted successfully!")
@@ -163,29 +582,12 @@ if uploaded_file is not None:
             with st.expander("View Extracted Text"):
                 st.text_area("Raw Text", extracted_text, height=200)
             
-            # Parse menu items
-            menu_items = parse_menu_items(extracted_text)
-            
             if menu_items:
                 st.subheader(f"🍽️ Found {len(menu_items)} Menu Items")
                 
                 # Display menu items and generate images
                 for i, item in enumerate(menu_items):
-                    st.markdown(f"### {item['name']}")
-                    if item['description']:
-                        st.write(f"*{item['description'][:200]}...*" if len(item['description']) > 200 else f"*{item['description']}*")
-                    
-                    # Generate image button
-                    if st.button(f"Generate Image for {item['name']}", key=f"gen_{i}"):
-                        if client:
-                            with st.spinner(f"Generating image for {item['name']}..."):
-                                generated_image = generate_food_image(item['name'], item['description'])
-                                if generated_image:
-                                    st.image(generated_image, caption=f"Generated: {item['name']}", width=300)
-                        else:
-                            st.warning("Please enter your OpenAI API key to generate images")
-                    
-                    st.divider()
+                    render_item(item, i)
                 
                 # Bulk generation option
                 if client:
@@ -193,19 +595,13 @@ if uploaded_file is not None:
                     if st.button("Generate All Images", type="primary"):
                         progress_bar = st.progress(0)
                         
-                        for i, item in enumerate(menu_items):
-                            with st.spinner(f"Generating {i+1}/{len(menu_items)}: {item['name']}"):
-                                generated_image = generate_food_image(item['name'], item['description'])
-                                if generated_image:
-                                    st.image(generated_image, caption=f"Generated: {item['name']}", width=300)
-                                
-                                # Update progress
-                                progress_bar.progress((i + 1) / len(menu_items))
-                                
-                                # Small delay to avoid rate limiting
-                                time.sleep(1)
+                        with st.spinner(f"Generating {len(menu_items)} images..."):
+                            failed = asyncio.run(generate_all_images_async(menu_items, progress_bar))
                         
-                        st.success("All images generated!")
+                        if failed:
+                            st.warning(f"{failed} of {len(menu_items)} images could not be generated.")
+                        else:
+                            st.success("All images generated!")
             
             else:
                 st.warning("No menu items could be identified. Try uploading a clearer image.")
@@ -226,9 +622,11 @@ st.sidebar.markdown("""
 
 Make sure you have installed:
 ```bash
-pip install streamlit pytesseract pillow openai requests
+pip install streamlit pytesseract pillow opencv-python-headless openai tenacity
 ```
 
+Optionally install `tesserocr` for faster in-process OCR.
+
 For Tesseract OCR, you may need to install it separately:
 - **Windows**: Download from GitHub releases
 - **Mac**: `brew install tesseract`